@@ -6,7 +6,7 @@ Provides conflict-free sync between SQLite databases using CRDTs.
 
 from .extension import load_crsqlite, is_crsqlite_available, CRSQLiteNotAvailable
 from .clock import VectorClock
-from .changes import ChangeTracker, Change, ChangeType
+from .changes import ChangeTracker, CrsqliteChangeTracker, Change, ChangeType
 from .merge import DatabaseMerger, MergeResult
 
 __version__ = "0.1.0"
@@ -16,6 +16,7 @@ __all__ = [
     "CRSQLiteNotAvailable",
     "VectorClock",
     "ChangeTracker",
+    "CrsqliteChangeTracker",
     "Change",
     "ChangeType",
     "DatabaseMerger",
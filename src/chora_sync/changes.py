@@ -6,13 +6,16 @@ Tracks changes to entities for syncing between databases.
 
 import sqlite3
 import json
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from pathlib import Path
 
 from .clock import VectorClock
+from . import extension as _crsqlite
 
 
 class ChangeType(Enum):
@@ -22,7 +25,11 @@ class ChangeType(Enum):
     DELETE = "delete"
 
 
-@dataclass
+# Precomputed lookup so from_dict skips the Enum.__call__ machinery.
+_CHANGE_TYPE_FROM_STR = {ct.value: ct for ct in ChangeType}
+
+
+@dataclass(frozen=True, slots=True)
 class Change:
     """
     A single change to an entity.
@@ -50,25 +57,116 @@ class Change:
             "site_id": self.site_id,
             "db_version": self.db_version,
             "clock": self.clock.to_dict(),
-            "timestamp": self.timestamp.isoformat(),
+            "timestamp": _timestamp_to_us(self.timestamp),
         }
 
     @classmethod
     def from_dict(cls, d: dict) -> "Change":
-        """Create from dictionary."""
+        """Create from dictionary (accepts ISO strings from older peers)."""
+        ts = d["timestamp"]
         return cls(
             entity_id=d["entity_id"],
-            change_type=ChangeType(d["change_type"]),
+            change_type=_CHANGE_TYPE_FROM_STR[d["change_type"]],
             table_name=d["table_name"],
             column_name=d.get("column_name"),
             value=d.get("value"),
             site_id=d["site_id"],
             db_version=d["db_version"],
             clock=VectorClock.from_dict(d["clock"]),
-            timestamp=datetime.fromisoformat(d["timestamp"]),
+            timestamp=_us_to_timestamp(ts) if isinstance(ts, int)
+            else datetime.fromisoformat(ts),
         )
 
 
+def _timestamp_to_us(dt: datetime) -> int:
+    """Convert a datetime to integer microseconds since the epoch (UTC)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1_000_000)
+
+
+def _us_to_timestamp(us: int) -> datetime:
+    """Convert integer microseconds since the epoch to an aware UTC datetime."""
+    return datetime.fromtimestamp(us / 1_000_000, tz=timezone.utc)
+
+
+def _change_to_row(change: Change) -> tuple:
+    """Convert a Change to a sync_changes parameter tuple."""
+    return (
+        change.entity_id,
+        change.change_type.value,
+        change.table_name,
+        change.column_name,
+        change.value,
+        change.site_id,
+        change.db_version,
+        change.clock.to_bytes(),
+        _timestamp_to_us(change.timestamp),
+    )
+
+# SQL reused across calls; module-level constants keep string identity
+# stable so the connection's statement cache hits reliably.
+_SQL_INSERT_CHANGE = """
+    INSERT INTO sync_changes
+    (entity_id, change_type, table_name, column_name, value, site_id, db_version, clock, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_CHANGE_IGNORE = """
+    INSERT OR IGNORE INTO sync_changes
+    (entity_id, change_type, table_name, column_name, value, site_id, db_version, clock, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_CHANGE_OR_IGNORE = """
+    INSERT INTO sync_changes
+    (entity_id, change_type, table_name, column_name, value, site_id, db_version, clock, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT DO NOTHING
+    RETURNING id
+"""
+
+_SQL_SELECT_SINCE = """
+    SELECT entity_id, change_type, table_name, column_name, value, site_id, db_version, clock, timestamp
+    FROM sync_changes
+    WHERE db_version > ?
+    ORDER BY db_version ASC
+"""
+
+_SQL_SELECT_SINCE_EXCLUDING = """
+    SELECT entity_id, change_type, table_name, column_name, value, site_id, db_version, clock, timestamp
+    FROM sync_changes
+    WHERE db_version > ? AND site_id != ?
+    ORDER BY db_version ASC
+"""
+
+_SQL_SELECT_HEADERS_SINCE = """
+    SELECT entity_id, site_id, db_version FROM sync_changes
+    WHERE db_version > ?
+    ORDER BY db_version ASC
+"""
+
+_SQL_UPDATE_CLOCK = "UPDATE sync_clock SET clock_json = ? WHERE id = 1"
+
+_SQL_SELECT_CLOCK = "SELECT clock_json FROM sync_clock WHERE id = 1"
+
+_SQL_INSERT_CLOCK = "INSERT INTO sync_clock (id, clock_json) VALUES (1, ?)"
+
+_SQL_SELECT_MAX_VERSION = "SELECT COALESCE(MAX(db_version), 0) as v FROM sync_changes"
+
+_SQL_UPSERT_SITE = """
+    INSERT INTO sync_sites (site_id, last_seen_version, last_sync)
+    VALUES (?, ?, ?)
+    ON CONFLICT(site_id) DO UPDATE SET
+        last_seen_version = excluded.last_seen_version,
+        last_sync = excluded.last_sync
+"""
+
+_SQL_SELECT_SITE_VERSION = "SELECT last_seen_version FROM sync_sites WHERE site_id = ?"
+
+_SQL_SELECT_SEEN = "SELECT site_id, db_version FROM sync_changes"
+
+
 class ChangeTracker:
     """
     Tracks changes to entities for sync.
@@ -77,75 +175,249 @@ class ChangeTracker:
     Changes can then be exchanged between databases for sync.
     """
 
-    def __init__(self, db_path: str, site_id: str):
+    @classmethod
+    def create(cls, db_path: str, site_id: str) -> "ChangeTracker":
         """
-        Initialize change tracker.
+        Create the fastest available tracker for a database.
+
+        Uses the cr-sqlite backed tracker when the extension is
+        installed, falling back to the pure-Python change log otherwise.
 
         Args:
             db_path: Path to SQLite database
             site_id: Unique identifier for this site/database
+
+        Returns:
+            A ChangeTracker (or CrsqliteChangeTracker) instance
+        """
+        if _crsqlite.is_crsqlite_available():
+            return CrsqliteChangeTracker(db_path, site_id)
+        return ChangeTracker(db_path, site_id)
+
+    def __init__(
+        self,
+        db_path: str,
+        site_id: str,
+        pragmas: Optional[dict] = None,
+        _skip_ddl: bool = False,
+    ):
         """
-        self.db_path = Path(db_path).expanduser()
+        Initialize change tracker.
+
+        Args:
+            db_path: Path to SQLite database, or a ``file:`` URI /
+                ``:memory:`` for an in-memory database
+            site_id: Unique identifier for this site/database
+            pragmas: Extra PRAGMA name/value pairs applied after the
+                defaults (e.g. ``{"synchronous": "OFF"}`` for throwaway
+                test databases)
+            _skip_ddl: Skip schema creation; the database must already
+                carry the schema (e.g. cloned from a template via the
+                SQLite backup API)
+        """
+        db_path = str(db_path)
+        self._is_uri = db_path.startswith("file:")
+        if self._is_uri or db_path == ":memory:":
+            self.db_path = db_path
+        else:
+            self.db_path = Path(db_path).expanduser()
         self.site_id = site_id
         self._current_clock = VectorClock()
+        self._db_version = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pragmas = pragmas
+        self._skip_ddl = _skip_ddl
+        self._in_batch = False
         self._init_tables()
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Get a database connection."""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Get the tracker's database connection, opening it on first use."""
+        if self._conn is None:
+            # isolation_level=None: autocommit, with explicit BEGIN/COMMIT
+            # around multi-statement writes (see _transaction) instead of
+            # sqlite3's implicit deferred transactions
+            conn = sqlite3.connect(
+                str(self.db_path),
+                uri=self._is_uri,
+                check_same_thread=False,
+                cached_statements=256,
+                isolation_level=None,
+            )
+            conn.row_factory = sqlite3.Row
+            # WAL mode is persistent; the remaining pragmas are per-connection
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-20000")
+            # Memory-map the database file for read paths (no-op in-memory)
+            conn.execute("PRAGMA mmap_size=268435456")
+            # Caller overrides win over the defaults above
+            if self._pragmas:
+                for name, value in self._pragmas.items():
+                    conn.execute(f"PRAGMA {name}={value}")
+            # Refresh planner statistics so index choice tracks table growth
+            conn.execute("PRAGMA optimize")
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run the block inside an explicit IMMEDIATE transaction.
 
-    def _init_tables(self) -> None:
-        """Initialize change tracking tables."""
+        Takes the write lock up front (no deferred-lock upgrade), commits
+        on success, rolls back on error. Inside batch() it is a no-op so
+        nested writes join the enclosing transaction.
+        """
         conn = self._get_connection()
+        if self._in_batch:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            conn.executescript("""
-                -- Change log table
-                CREATE TABLE IF NOT EXISTS sync_changes (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    entity_id TEXT NOT NULL,
-                    change_type TEXT NOT NULL CHECK (change_type IN ('insert', 'update', 'delete')),
-                    table_name TEXT NOT NULL,
-                    column_name TEXT,
-                    value TEXT,
-                    site_id TEXT NOT NULL,
-                    db_version INTEGER NOT NULL,
-                    clock_json TEXT NOT NULL,
-                    timestamp TEXT NOT NULL
-                );
-
-                CREATE INDEX IF NOT EXISTS idx_sync_changes_version ON sync_changes(db_version);
-                CREATE INDEX IF NOT EXISTS idx_sync_changes_entity ON sync_changes(entity_id);
-
-                -- Site metadata table
-                CREATE TABLE IF NOT EXISTS sync_sites (
-                    site_id TEXT PRIMARY KEY,
-                    last_seen_version INTEGER DEFAULT 0,
-                    last_sync TEXT
-                );
-
-                -- Local clock state
-                CREATE TABLE IF NOT EXISTS sync_clock (
-                    id INTEGER PRIMARY KEY CHECK (id = 1),
-                    clock_json TEXT NOT NULL
-                );
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self) -> "ChangeTracker":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    # Tables owned by the tracker; static, so no sqlite_master query needed
+    _TABLES = frozenset({"sync_changes", "sync_sites", "sync_clock"})
+
+    def table_names(self) -> frozenset:
+        """Names of the tables backing this tracker."""
+        return self._TABLES
+
+    @classmethod
+    def _create_tables(cls, conn: sqlite3.Connection) -> None:
+        """Create the change tracking schema on a connection."""
+        cls._create_changes_table(conn)
+
+        # Site metadata table
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_sites (
+                site_id TEXT PRIMARY KEY,
+                last_seen_version INTEGER DEFAULT 0,
+                last_sync TEXT
+            )
+        """)
+
+        # Local clock state
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_clock (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                clock_json TEXT NOT NULL
+            )
+        """)
+
+    @classmethod
+    def _create_changes_table(cls, conn: sqlite3.Connection) -> None:
+        """Create the change log table and its indexes."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                entity_id TEXT NOT NULL,
+                change_type TEXT NOT NULL CHECK (change_type IN ('insert', 'update', 'delete')),
+                table_name TEXT NOT NULL,
+                column_name TEXT,
+                value TEXT,
+                site_id TEXT NOT NULL,
+                db_version INTEGER NOT NULL,
+                clock BLOB NOT NULL,
+                timestamp INTEGER NOT NULL,
+                UNIQUE(entity_id, site_id, db_version)
+            )
+        """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sync_changes_version ON sync_changes(db_version DESC)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sync_changes_site_version ON sync_changes(site_id, db_version)"
+        )
+
+    def _migrate_legacy_schema(self) -> None:
+        """
+        Rebuild a pre-series sync_changes table in the current shape.
+
+        Early databases stored clocks as JSON text in a clock_json
+        column and timestamps as ISO-8601 strings, without the
+        UNIQUE(entity_id, site_id, db_version) constraint. Rewrite such
+        a table once, converting each row's clock to the binary
+        encoding and its timestamp to integer microseconds.
+        """
+        conn = self._get_connection()
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(sync_changes)")}
+        if "clock_json" not in columns:
+            return
+
+        def convert(row: sqlite3.Row) -> tuple:
+            (entity_id, change_type, table_name, column_name, value,
+             site_id, db_version, clock_json, timestamp) = row
+            return (
+                entity_id, change_type, table_name, column_name, value,
+                site_id, db_version,
+                VectorClock.from_json(clock_json).to_bytes(),
+                _timestamp_to_us(datetime.fromisoformat(timestamp)),
+            )
+
+        with self._transaction():
+            # The legacy indexes would follow the renamed table and shadow
+            # the current names; drop them first
+            conn.execute("DROP INDEX IF EXISTS idx_sync_changes_version")
+            conn.execute("DROP INDEX IF EXISTS idx_sync_changes_entity")
+            conn.execute("ALTER TABLE sync_changes RENAME TO sync_changes_legacy")
+            self._create_changes_table(conn)
+            rows = conn.execute("""
+                SELECT entity_id, change_type, table_name, column_name, value,
+                       site_id, db_version, clock_json, timestamp
+                FROM sync_changes_legacy
+                ORDER BY id
             """)
+            # OR IGNORE: the legacy table never enforced uniqueness
+            conn.executemany("""
+                INSERT OR IGNORE INTO sync_changes
+                (entity_id, change_type, table_name, column_name, value, site_id, db_version, clock, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, map(convert, rows))
+            conn.execute("DROP TABLE sync_changes_legacy")
 
-            # Load or initialize clock
-            row = conn.execute("SELECT clock_json FROM sync_clock WHERE id = 1").fetchone()
-            if row:
-                self._current_clock = VectorClock.from_json(row["clock_json"])
-            else:
-                self._current_clock = VectorClock()
-                conn.execute(
-                    "INSERT INTO sync_clock (id, clock_json) VALUES (1, ?)",
-                    (self._current_clock.to_json(),)
-                )
-
-            conn.commit()
-        finally:
-            conn.close()
+    def _init_tables(self) -> None:
+        """Initialize change tracking tables and load persisted state."""
+        conn = self._get_connection()
+        if not self._skip_ddl:
+            self._migrate_legacy_schema()
+            self._create_tables(conn)
+
+        # Load or initialize clock
+        row = conn.execute(_SQL_SELECT_CLOCK).fetchone()
+        if row:
+            self._current_clock = VectorClock.from_json(row["clock_json"])
+        else:
+            self._current_clock = VectorClock()
+            conn.execute(_SQL_INSERT_CLOCK, (self._current_clock.to_json(),))
+
+        # Cache the current max version; record_change increments it locally
+        row = conn.execute(_SQL_SELECT_MAX_VERSION).fetchone()
+        self._db_version = row["v"]
+
+        # Cache known (site_id, db_version) pairs so duplicate checks on
+        # the apply paths don't need a database round-trip
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        self._seen = set(cursor.execute(_SQL_SELECT_SEEN).fetchall())
 
     def record_change(
         self,
@@ -171,103 +443,182 @@ class ChangeTracker:
         # Increment clock for this site
         self._current_clock = self._current_clock.increment(self.site_id)
 
+        db_version = self._db_version + 1
+
+        timestamp = _us_to_timestamp(time.time_ns() // 1_000)
+
+        change = Change(
+            entity_id=entity_id,
+            change_type=change_type,
+            table_name=table_name,
+            column_name=column_name,
+            value=value,
+            site_id=self.site_id,
+            db_version=db_version,
+            clock=self._current_clock,
+            timestamp=timestamp,
+        )
+
+        with self._transaction() as conn:
+            # Insert change record
+            conn.execute(_SQL_INSERT_CHANGE, _change_to_row(change))
+            # Update local clock state
+            conn.execute(_SQL_UPDATE_CLOCK, (self._current_clock.to_json(),))
+
+        self._db_version = db_version
+        self._seen.add((self.site_id, db_version))
+        return change
+
+    @contextmanager
+    def batch(self) -> Iterator["ChangeTracker"]:
+        """
+        Group several record calls into a single transaction.
+
+        Inside the block, record_change()/record_changes() defer their
+        commit; the whole batch commits (one fsync) on exit, or rolls
+        back if the block raises. Nested batch() blocks join the
+        outermost transaction.
+        """
         conn = self._get_connection()
+        if self._in_batch:
+            # Already batching; the enclosing block owns the transaction
+            yield self
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._in_batch = True
         try:
-            # Get current db version
-            row = conn.execute("SELECT COALESCE(MAX(db_version), 0) as v FROM sync_changes").fetchone()
-            db_version = row["v"] + 1
+            yield self
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            # In-memory clock/version advanced for rows that were just
+            # rolled back; re-read the persisted state
+            self._init_tables()
+            raise
+        finally:
+            self._in_batch = False
 
-            timestamp = datetime.utcnow()
+    def record_changes(self, specs: List[tuple]) -> List[Change]:
+        """
+        Record a batch of changes in a single transaction.
+
+        Equivalent to calling record_change() per entry, but inserts
+        with one executemany and commits (fsyncs) once for the batch.
 
-            change = Change(
+        Args:
+            specs: List of (entity_id, change_type, column_name, value)
+                tuples; table_name defaults to "entities"
+
+        Returns:
+            The recorded Changes, in order
+        """
+        if not specs:
+            return []
+
+        clock = self._current_clock
+        db_version = self._db_version
+        timestamp = _us_to_timestamp(time.time_ns() // 1_000)
+
+        changes = []
+        for entity_id, change_type, column_name, value in specs:
+            clock = clock.increment(self.site_id)
+            db_version += 1
+            changes.append(Change(
                 entity_id=entity_id,
                 change_type=change_type,
-                table_name=table_name,
+                table_name="entities",
                 column_name=column_name,
                 value=value,
                 site_id=self.site_id,
                 db_version=db_version,
-                clock=self._current_clock,
+                clock=clock,
                 timestamp=timestamp,
-            )
+            ))
 
-            # Insert change record
-            conn.execute(
-                """
-                INSERT INTO sync_changes
-                (entity_id, change_type, table_name, column_name, value, site_id, db_version, clock_json, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    change.entity_id,
-                    change.change_type.value,
-                    change.table_name,
-                    change.column_name,
-                    change.value,
-                    change.site_id,
-                    change.db_version,
-                    change.clock.to_json(),
-                    change.timestamp.isoformat(),
-                ),
-            )
+        with self._transaction() as conn:
+            conn.executemany(_SQL_INSERT_CHANGE, [_change_to_row(c) for c in changes])
+            conn.execute(_SQL_UPDATE_CLOCK, (clock.to_json(),))
 
-            # Update local clock state
-            conn.execute(
-                "UPDATE sync_clock SET clock_json = ? WHERE id = 1",
-                (self._current_clock.to_json(),)
-            )
+        self._current_clock = clock
+        self._db_version = db_version
+        self._seen.update((self.site_id, c.db_version) for c in changes)
+        return changes
 
-            conn.commit()
-            return change
-        finally:
-            conn.close()
+    def iter_changes_since(
+        self,
+        since_version: int = 0,
+        exclude_site_id: Optional[str] = None,
+    ) -> Iterator[Change]:
+        """
+        Iterate over changes since a version, without materializing them all.
+
+        Args:
+            since_version: Get changes after this version
+            exclude_site_id: Skip changes that originated at this site
 
-    def get_changes_since(self, since_version: int = 0) -> List[Change]:
+        Yields:
+            Changes in db_version order
+        """
+        conn = self._get_connection()
+        # Plain tuples on the scan path; Row wrappers cost an allocation per row
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        if exclude_site_id is not None:
+            cursor.execute(_SQL_SELECT_SINCE_EXCLUDING, (since_version, exclude_site_id))
+        else:
+            cursor.execute(_SQL_SELECT_SINCE, (since_version,))
+        for (entity_id, change_type, table_name, column_name, value,
+             site_id, db_version, clock_blob, timestamp_us) in cursor:
+            yield Change(
+                entity_id=entity_id,
+                change_type=_CHANGE_TYPE_FROM_STR[change_type],
+                table_name=table_name,
+                column_name=column_name,
+                value=value,
+                site_id=site_id,
+                db_version=db_version,
+                clock=VectorClock.from_bytes(clock_blob),
+                timestamp=_us_to_timestamp(timestamp_us),
+            )
+
+    def get_changes_since(
+        self,
+        since_version: int = 0,
+        exclude_site_id: Optional[str] = None,
+    ) -> List[Change]:
         """
         Get all changes since a version.
 
         Args:
             since_version: Get changes after this version
+            exclude_site_id: Skip changes that originated at this site
 
         Returns:
             List of changes
         """
-        conn = self._get_connection()
-        try:
-            rows = conn.execute(
-                """
-                SELECT * FROM sync_changes
-                WHERE db_version > ?
-                ORDER BY db_version ASC
-                """,
-                (since_version,),
-            ).fetchall()
-
-            return [
-                Change(
-                    entity_id=row["entity_id"],
-                    change_type=ChangeType(row["change_type"]),
-                    table_name=row["table_name"],
-                    column_name=row["column_name"],
-                    value=row["value"],
-                    site_id=row["site_id"],
-                    db_version=row["db_version"],
-                    clock=VectorClock.from_json(row["clock_json"]),
-                    timestamp=datetime.fromisoformat(row["timestamp"]),
-                )
-                for row in rows
-            ]
-        finally:
-            conn.close()
+        return list(self.iter_changes_since(since_version, exclude_site_id))
+
+    def get_change_headers_since(self, since_version: int = 0) -> List[tuple]:
+        """
+        Get only the identifying headers of changes since a version.
+
+        Cheaper than get_changes_since for consumers that filter on
+        origin (e.g. duplicate suppression), since no clock or timestamp
+        is parsed per row.
+
+        Args:
+            since_version: Get changes after this version
+
+        Returns:
+            List of (entity_id, site_id, db_version) tuples in db_version order
+        """
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = None
+        return cursor.execute(_SQL_SELECT_HEADERS_SINCE, (since_version,)).fetchall()
 
     def get_current_version(self) -> int:
         """Get the current database version."""
-        conn = self._get_connection()
-        try:
-            row = conn.execute("SELECT COALESCE(MAX(db_version), 0) as v FROM sync_changes").fetchone()
-            return row["v"]
-        finally:
-            conn.close()
+        return self._db_version
 
     def get_current_clock(self) -> VectorClock:
         """Get the current vector clock."""
@@ -285,53 +636,91 @@ class ChangeTracker:
         Returns:
             True if change was applied, False if it was a duplicate or old
         """
-        conn = self._get_connection()
-        try:
-            # Check if we've already seen this change
-            existing = conn.execute(
-                """
-                SELECT clock_json FROM sync_changes
-                WHERE entity_id = ? AND site_id = ? AND db_version = ?
-                """,
-                (change.entity_id, change.site_id, change.db_version),
-            ).fetchone()
-
-            if existing:
+        key = (change.site_id, change.db_version)
+        if key in self._seen:
+            return False  # Already have this change; no database work
+
+        with self._transaction() as conn:
+            # The UNIQUE(entity_id, site_id, db_version) constraint rejects
+            # duplicates inside the insert itself; RETURNING tells us whether
+            # the row actually landed
+            cursor = conn.execute(_SQL_INSERT_CHANGE_OR_IGNORE, _change_to_row(change))
+            if cursor.fetchone() is None:
+                self._seen.add(key)
                 return False  # Already have this change
 
-            # Merge clocks
-            self._current_clock = self._current_clock.merge(change.clock)
+            # Merge clocks and update local clock state
+            merged_clock = self._current_clock.merge(change.clock)
+            conn.execute(_SQL_UPDATE_CLOCK, (merged_clock.to_json(),))
 
-            # Record the remote change
-            conn.execute(
-                """
-                INSERT INTO sync_changes
-                (entity_id, change_type, table_name, column_name, value, site_id, db_version, clock_json, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    change.entity_id,
-                    change.change_type.value,
-                    change.table_name,
-                    change.column_name,
-                    change.value,
-                    change.site_id,
-                    change.db_version,
-                    change.clock.to_json(),
-                    change.timestamp.isoformat(),
-                ),
-            )
+        self._seen.add(key)
+        self._current_clock = merged_clock
+        self._db_version = max(self._db_version, change.db_version)
+        return True
 
-            # Update local clock
-            conn.execute(
-                "UPDATE sync_clock SET clock_json = ? WHERE id = 1",
-                (self._current_clock.to_json(),)
+    def apply_remote_changes_bulk(self, changes: List[Change]) -> int:
+        """
+        Apply a batch of changes from a remote site in one transaction.
+
+        Equivalent to calling apply_remote_change() for each change, but
+        filters duplicates against the in-memory seen-set, then runs one
+        bulk INSERT and one commit for the whole batch.
+
+        Args:
+            changes: Changes from a remote site
+
+        Returns:
+            Number of changes actually inserted (duplicates are skipped)
+        """
+        if not changes:
+            return 0
+
+        # Filter duplicates against the in-memory seen-set; no prefetch query
+        seen = self._seen
+        new_changes = [
+            c for c in changes if (c.site_id, c.db_version) not in seen
+        ]
+        if not new_changes:
+            return 0
+
+        # Merge all incoming clocks in memory, write the result once
+        merged_clock = self._current_clock
+        for change in new_changes:
+            merged_clock = merged_clock.merge(change.clock)
+
+        with self._transaction() as conn:
+            # executemany consumes lazily; no need to materialize the rows.
+            # OR IGNORE lets the UNIQUE constraint drop duplicates the
+            # seen-set missed (repeats within the batch, or rows written by
+            # another tracker on the same database) instead of aborting
+            cursor = conn.executemany(
+                _SQL_INSERT_CHANGE_IGNORE, map(_change_to_row, new_changes)
             )
+            applied = cursor.rowcount
+            conn.execute(_SQL_UPDATE_CLOCK, (merged_clock.to_json(),))
 
-            conn.commit()
-            return True
-        finally:
-            conn.close()
+        self._current_clock = merged_clock
+        self._db_version = max(
+            self._db_version, max(c.db_version for c in new_changes)
+        )
+        seen.update((c.site_id, c.db_version) for c in new_changes)
+        return applied
+
+    def reset(self) -> None:
+        """
+        Clear all tracked state, keeping the connection and schema.
+
+        Deletes every recorded change and known site and zeroes the
+        clock, in one transaction. Mainly useful for reusing a tracker
+        across test cases instead of rebuilding its database.
+        """
+        self._current_clock = VectorClock()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM sync_changes")
+            conn.execute("DELETE FROM sync_sites")
+            conn.execute(_SQL_UPDATE_CLOCK, (self._current_clock.to_json(),))
+        self._db_version = 0
+        self._seen.clear()
 
     def update_site_version(self, site_id: str, version: int) -> None:
         """
@@ -342,20 +731,10 @@ class ChangeTracker:
             version: Last version we synced from that site
         """
         conn = self._get_connection()
-        try:
-            conn.execute(
-                """
-                INSERT INTO sync_sites (site_id, last_seen_version, last_sync)
-                VALUES (?, ?, ?)
-                ON CONFLICT(site_id) DO UPDATE SET
-                    last_seen_version = excluded.last_seen_version,
-                    last_sync = excluded.last_sync
-                """,
-                (site_id, version, datetime.utcnow().isoformat()),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        conn.execute(
+            _SQL_UPSERT_SITE,
+            (site_id, version, datetime.now(timezone.utc).isoformat()),
+        )
 
     def get_site_version(self, site_id: str) -> int:
         """
@@ -367,12 +746,80 @@ class ChangeTracker:
         Returns:
             Last version we synced from that site, or 0
         """
-        conn = self._get_connection()
-        try:
-            row = conn.execute(
-                "SELECT last_seen_version FROM sync_sites WHERE site_id = ?",
-                (site_id,),
-            ).fetchone()
-            return row["last_seen_version"] if row else 0
-        finally:
-            conn.close()
+        cursor = self._get_connection().cursor()
+        cursor.row_factory = None
+        row = cursor.execute(_SQL_SELECT_SITE_VERSION, (site_id,)).fetchone()
+        return row[0] if row else 0
+
+
+class CrsqliteChangeTracker(ChangeTracker):
+    """
+    ChangeTracker backed by the cr-sqlite extension.
+
+    cr-sqlite captures per-row changes natively in C through its
+    crsql_changes virtual table, so change capture and catch-up reads
+    bypass the Python-side sync_changes log entirely. Note that the
+    change rows exchanged by this tracker are raw crsql_changes tuples,
+    not Change objects; both ends of a sync must use the same tracker
+    implementation.
+    """
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Get the tracker's connection with cr-sqlite loaded."""
+        if self._conn is None:
+            conn = super()._get_connection()
+            _crsqlite.load_crsqlite(conn)
+        return self._conn
+
+    def record_change(
+        self,
+        entity_id: str,
+        change_type: ChangeType,
+        table_name: str = "entities",
+        column_name: Optional[str] = None,
+        value: Optional[str] = None,
+    ) -> Optional[Change]:
+        """
+        No-op: cr-sqlite captures table writes automatically via triggers.
+
+        Returns:
+            None; the change is recorded by the extension, not Python
+        """
+        return None
+
+    def get_current_version(self) -> int:
+        """Get the current database version from cr-sqlite."""
+        return _crsqlite.get_db_version(self._get_connection())
+
+    def get_changes_since(
+        self,
+        since_version: int = 0,
+        exclude_site_id: Optional[str] = None,
+    ) -> list:
+        """
+        Get raw crsql_changes rows since a version.
+
+        Args:
+            since_version: Get changes after this version
+            exclude_site_id: Ignored; cr-sqlite tracks origin internally
+
+        Returns:
+            List of crsql_changes tuples
+        """
+        return _crsqlite.get_changes_since(self._get_connection(), since_version)
+
+    def apply_remote_changes_bulk(self, changes: list) -> int:
+        """
+        Apply raw crsql_changes rows from another database.
+
+        Args:
+            changes: crsql_changes tuples from get_changes_since()
+
+        Returns:
+            Number of changes applied
+        """
+        if not changes:
+            return 0
+        with self._transaction() as conn:
+            _crsqlite.apply_changes(conn, changes)
+        return len(changes)
@@ -8,11 +8,44 @@ or are concurrent.
 
 import json
 from dataclasses import dataclass, field
-from typing import Dict, Optional
-from copy import deepcopy
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple, Union
 
+try:
+    # Optional fast path: orjson parses/serializes small dicts several
+    # times faster than stdlib json.
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
 
-@dataclass
+
+def _encode_varint(value: int) -> bytes:
+    """Encode a non-negative int as an unsigned LEB128 varint."""
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _decode_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decode an unsigned LEB128 varint; returns (value, next offset)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+@dataclass(frozen=True, slots=True)
 class VectorClock:
     """
     A vector clock for tracking causality.
@@ -22,9 +55,18 @@ class VectorClock:
     - clock1 < clock2: clock1 happened-before clock2
     - clock1 > clock2: clock2 happened-before clock1
     - clock1 || clock2: concurrent (neither happened-before)
+
+    Clocks are immutable: operations return new instances and
+    `counters` must never be mutated in place.
     """
 
     counters: Dict[str, int] = field(default_factory=dict)
+    _hash: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def single(cls, site_id: str, count: int = 1) -> "VectorClock":
+        """Clock with one site's counter set (shorthand constructor)."""
+        return cls(counters={site_id: count})
 
     def increment(self, site_id: str) -> "VectorClock":
         """
@@ -36,7 +78,7 @@ class VectorClock:
         Returns:
             New VectorClock with incremented counter
         """
-        new_counters = deepcopy(self.counters)
+        new_counters = self.counters.copy()
         new_counters[site_id] = new_counters.get(site_id, 0) + 1
         return VectorClock(counters=new_counters)
 
@@ -50,11 +92,15 @@ class VectorClock:
         Returns:
             New VectorClock with merged counters
         """
-        all_sites = set(self.counters.keys()) | set(other.counters.keys())
-        new_counters = {
-            site: max(self.counters.get(site, 0), other.counters.get(site, 0))
-            for site in all_sites
-        }
+        # Copy the larger side and walk the smaller one; merge cost then
+        # scales with the smaller clock.
+        ours, theirs = self.counters, other.counters
+        if len(ours) < len(theirs):
+            ours, theirs = theirs, ours
+        new_counters = dict(ours)
+        for site, count in theirs.items():
+            if count > new_counters.get(site, 0):
+                new_counters[site] = count
         return VectorClock(counters=new_counters)
 
     def compare(self, other: "VectorClock") -> Optional[int]:
@@ -70,28 +116,35 @@ class VectorClock:
              0 if equal
              None if concurrent (no causal ordering)
         """
-        all_sites = set(self.counters.keys()) | set(other.counters.keys())
+        ours = self.counters
+        theirs = other.counters
 
         less_or_equal = True
         greater_or_equal = True
 
-        for site in all_sites:
-            self_val = self.counters.get(site, 0)
-            other_val = other.counters.get(site, 0)
-
+        for site, self_val in ours.items():
+            other_val = theirs.get(site, 0)
             if self_val > other_val:
                 less_or_equal = False
-            if self_val < other_val:
+            elif self_val < other_val:
                 greater_or_equal = False
+            if not less_or_equal and not greater_or_equal:
+                return None  # Concurrent
+
+        for site, other_val in theirs.items():
+            if site in ours:
+                continue  # Already compared above
+            if other_val > 0:
+                greater_or_equal = False
+            if not less_or_equal and not greater_or_equal:
+                return None  # Concurrent
 
         if less_or_equal and greater_or_equal:
             return 0  # Equal
         elif less_or_equal:
             return -1  # self happened-before other
-        elif greater_or_equal:
-            return 1  # other happened-before self
         else:
-            return None  # Concurrent
+            return 1  # other happened-before self
 
     def __lt__(self, other: "VectorClock") -> bool:
         """Return True if self happened-before other."""
@@ -107,6 +160,15 @@ class VectorClock:
             return False
         return self.compare(other) == 0
 
+    def __hash__(self) -> int:
+        """Hash over non-zero counters (zero counters compare equal to absent)."""
+        if self._hash is None:
+            # Clocks are frozen, so the hash is computed once and cached.
+            object.__setattr__(self, "_hash", hash(frozenset(
+                (site, count) for site, count in self.counters.items() if count
+            )))
+        return self._hash
+
     def __le__(self, other: "VectorClock") -> bool:
         """Return True if self happened-before-or-equal other."""
         cmp = self.compare(other)
@@ -127,18 +189,68 @@ class VectorClock:
 
     def to_json(self) -> str:
         """Serialize to JSON string."""
+        if _orjson is not None:
+            return _orjson.dumps(self.counters).decode()
         return json.dumps(self.counters)
 
     @classmethod
-    def from_json(cls, json_str: str) -> "VectorClock":
-        """Deserialize from JSON string."""
+    def from_json(cls, json_str: Union[str, bytes]) -> "VectorClock":
+        """Deserialize from a JSON string (or UTF-8 bytes)."""
+        if _orjson is not None:
+            return cls(counters=_orjson.loads(json_str))
         return cls(counters=json.loads(json_str))
 
+    def to_bytes(self) -> bytes:
+        """
+        Serialize to a compact binary blob.
+
+        Format: varint site count, then per site a varint-length-prefixed
+        UTF-8 site ID followed by a varint counter. Several times smaller
+        and faster to parse than the JSON form used on the wire.
+        """
+        parts = [_encode_varint(len(self.counters))]
+        for site, count in self.counters.items():
+            raw = site.encode("utf-8")
+            parts.append(_encode_varint(len(raw)))
+            parts.append(raw)
+            parts.append(_encode_varint(count))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: Union[bytes, str]) -> "VectorClock":
+        """
+        Deserialize from the compact binary form produced by to_bytes().
+
+        Also accepts the JSON form older databases stored in the clock
+        column; legacy TEXT columns yield str values, which is the only
+        unambiguous signal (sniffing blob contents misfires, since a
+        123-site clock starts with the byte value of ``{``).
+        """
+        if isinstance(data, str):
+            return cls.from_json(data)
+        count, offset = _decode_varint(data, 0)
+        counters = {}
+        for _ in range(count):
+            length, offset = _decode_varint(data, offset)
+            site = data[offset:offset + length].decode("utf-8")
+            offset += length
+            counters[site], offset = _decode_varint(data, offset)
+        return cls(counters=counters)
+
     def to_dict(self) -> Dict[str, int]:
-        """Convert to dictionary."""
-        return deepcopy(self.counters)
+        """Convert to dictionary (a copy the caller may mutate)."""
+        return self.counters.copy()
+
+    def to_mapping(self) -> Mapping[str, int]:
+        """
+        Read-only view of the counters without copying.
+
+        Prefer this over to_dict() when the result is only read, e.g.
+        when serializing changes.
+        """
+        return MappingProxyType(self.counters)
 
     @classmethod
     def from_dict(cls, d: Dict[str, int]) -> "VectorClock":
         """Create from dictionary."""
-        return cls(counters=deepcopy(d))
+        return cls(counters=dict(d))
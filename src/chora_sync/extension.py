@@ -7,6 +7,7 @@ CR-SQLite is a SQLite extension that adds CRDT support for conflict-free sync.
 import sqlite3
 import platform
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -16,10 +17,33 @@ class CRSQLiteNotAvailable(Exception):
     pass
 
 
+def _resolve_env_path(exists_fn=Path.exists) -> Optional[Path]:
+    """
+    Resolve the CRSQLITE_PATH environment override, if set and present.
+
+    Args:
+        exists_fn: Existence check, injectable for tests (avoids
+            patching pathlib's C-implemented Path.exists)
+
+    Returns:
+        Path from CRSQLITE_PATH, or None if unset or missing on disk
+    """
+    env_path = os.environ.get("CRSQLITE_PATH")
+    if not env_path:
+        return None
+    path = Path(env_path)
+    return path if exists_fn(path) else None
+
+
+@lru_cache(maxsize=1)
 def get_extension_path() -> Optional[Path]:
     """
     Get the path to the cr-sqlite extension for the current platform.
 
+    The result is cached for the life of the process (the platform and
+    install locations don't change); tests can reset it with
+    ``get_extension_path.cache_clear()``.
+
     Returns:
         Path to extension file, or None if not found
     """
@@ -48,15 +72,14 @@ def get_extension_path() -> Optional[Path]:
         # System-level
         Path("/usr/local/lib") / ext_name,
         Path("/usr/lib") / ext_name,
-        # Environment variable
-        Path(os.environ.get("CRSQLITE_PATH", "")) if os.environ.get("CRSQLITE_PATH") else None,
     ]
 
     for path in search_paths:
-        if path and path.exists():
+        if path.exists():
             return path
 
-    return None
+    # Environment variable
+    return _resolve_env_path()
 
 
 def is_crsqlite_available() -> bool:
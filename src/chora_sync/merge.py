@@ -4,6 +4,8 @@ Database merge operations for sync.
 Merges changes between two databases using vector clocks for ordering.
 """
 
+import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import List, Tuple, Optional
 from pathlib import Path
@@ -11,6 +13,13 @@ from pathlib import Path
 from .clock import VectorClock
 from .changes import ChangeTracker, Change, ChangeType
 
+try:
+    # Optional fast path, mirroring clock.py: orjson encodes/decodes the
+    # small change dicts several times faster than stdlib json.
+    import orjson as _orjson
+except ImportError:  # pragma: no cover
+    _orjson = None
+
 
 @dataclass
 class MergeResult:
@@ -26,6 +35,39 @@ class MergeResult:
         return len(self.errors) == 0
 
 
+def serialize_changes(changes: List[Change]) -> bytes:
+    """
+    Encode changes into a compact wire payload.
+
+    The format is a JSON array of Change dicts (integer-microsecond
+    timestamps), for sending changes to an out-of-process peer.
+
+    Args:
+        changes: Changes to encode
+
+    Returns:
+        Payload bytes for deserialize_changes()
+    """
+    payload = [change.to_dict() for change in changes]
+    if _orjson is not None:
+        return _orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def deserialize_changes(data: bytes) -> List[Change]:
+    """
+    Decode a payload produced by serialize_changes().
+
+    Args:
+        data: Payload bytes
+
+    Returns:
+        The decoded Changes, in order
+    """
+    raw = _orjson.loads(data) if _orjson is not None else json.loads(data)
+    return [Change.from_dict(d) for d in raw]
+
+
 class DatabaseMerger:
     """
     Merges changes between two databases.
@@ -58,11 +100,10 @@ class DatabaseMerger:
         # Get the last version the remote site has seen
         last_remote_version = self.local.get_site_version(remote_site_id)
 
-        # Get all changes since then
-        changes = self.local.get_changes_since(last_remote_version)
-
-        # Filter out changes that originated from the remote site
-        changes_to_send = [c for c in changes if c.site_id != remote_site_id]
+        # Get all changes since then, excluding the remote's own in SQL
+        changes_to_send = self.local.get_changes_since(
+            last_remote_version, exclude_site_id=remote_site_id
+        )
 
         return changes_to_send, self.local.get_current_version()
 
@@ -87,12 +128,10 @@ class DatabaseMerger:
         conflicts = 0
         errors = []
 
-        for change in changes:
-            try:
-                if self.local.apply_remote_change(change):
-                    applied += 1
-            except Exception as e:
-                errors.append(f"Error applying change {change.entity_id}: {e}")
+        try:
+            applied = self.local.apply_remote_changes_bulk(changes)
+        except Exception as e:
+            errors.append(f"Error applying changes from {remote_site_id}: {e}")
 
         # Update the last seen version for this remote
         self.local.update_site_version(remote_site_id, remote_version)
@@ -117,13 +156,21 @@ class DatabaseMerger:
         remote_site_id = remote_tracker.site_id
         local_site_id = self.local.site_id
 
-        # Get changes to send to remote
-        changes_to_send, local_version = self.get_changes_for_remote(remote_site_id)
-
-        # Get changes from remote
         last_remote_version = self.local.get_site_version(remote_site_id)
-        remote_changes = remote_tracker.get_changes_since(last_remote_version)
-        remote_changes = [c for c in remote_changes if c.site_id != local_site_id]
+
+        # Read both sides concurrently; they hit different database files
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            send_future = executor.submit(
+                self.get_changes_for_remote, remote_site_id
+            )
+            receive_future = executor.submit(
+                remote_tracker.get_changes_since,
+                last_remote_version,
+                exclude_site_id=local_site_id,
+            )
+            changes_to_send, local_version = send_future.result()
+            remote_changes = receive_future.result()
+
         remote_current_version = remote_tracker.get_current_version()
 
         # Apply remote changes locally
@@ -132,22 +179,20 @@ class DatabaseMerger:
         )
 
         # Apply local changes to remote
-        remote_merger = DatabaseMerger(remote_tracker)
-        remote_result = remote_merger.apply_remote_changes(
-            changes_to_send, local_site_id, local_version
-        )
+        remote_errors = []
+        try:
+            remote_tracker.apply_remote_changes_bulk(changes_to_send)
+        except Exception as e:
+            remote_errors.append(f"Remote: Error applying changes from {local_site_id}: {e}")
 
         # Update remote's view of local version
         remote_tracker.update_site_version(local_site_id, local_version)
 
-        # Combine results
-        all_errors = local_result.errors + [f"Remote: {e}" for e in remote_result.errors]
-
         return MergeResult(
             changes_sent=len(changes_to_send),
             changes_received=local_result.changes_received,
-            conflicts_resolved=local_result.conflicts_resolved + remote_result.conflicts_resolved,
-            errors=all_errors,
+            conflicts_resolved=local_result.conflicts_resolved,
+            errors=local_result.errors + remote_errors,
         )
 
 
@@ -0,0 +1,103 @@
+"""
+Shared fixtures for the chora-sync test suite.
+"""
+
+import os
+import pytest
+import sqlite3
+import uuid
+
+from chora_sync.changes import ChangeTracker
+
+
+def memory_db_uri(prefix: str = "chora") -> str:
+    """
+    Unique shared-cache in-memory database URI (no disk I/O).
+
+    Folds the pytest-xdist worker id into the name so shared-cache
+    databases can't collide across parallel workers.
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "main")
+    return f"file:{prefix}_{worker}_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+
+@pytest.fixture
+def temp_db():
+    """Unique in-memory shared-cache database URI (no disk I/O)."""
+    return memory_db_uri()
+
+
+@pytest.fixture
+def temp_db_a():
+    """Unique in-memory shared-cache database URI for site A."""
+    return memory_db_uri("merge_a")
+
+
+@pytest.fixture
+def temp_db_b():
+    """Unique in-memory shared-cache database URI for site B."""
+    return memory_db_uri("merge_b")
+
+
+@pytest.fixture(scope="session")
+def schema_template():
+    """Empty-schema template database, cloned into per-test databases."""
+    conn = sqlite3.connect(":memory:")
+    ChangeTracker._create_tables(conn)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def make_tracker(schema_template):
+    """
+    Factory for trackers on fresh in-memory databases.
+
+    The schema is page-copied from the session template instead of
+    re-running DDL per test; a seed connection keeps each shared
+    in-memory database alive until teardown.
+    """
+    seeds = []
+    trackers = []
+
+    def _make(site_id: str, db_uri: str = None, **kwargs) -> ChangeTracker:
+        uri = db_uri or memory_db_uri()
+        seed = sqlite3.connect(uri, uri=True)
+        schema_template.backup(seed)
+        seeds.append(seed)
+        tracker = ChangeTracker(uri, site_id, _skip_ddl=True, **kwargs)
+        trackers.append(tracker)
+        return tracker
+
+    yield _make
+
+    for tracker in trackers:
+        tracker.close()
+    for seed in seeds:
+        seed.close()
+
+
+@pytest.fixture(scope="class")
+def tracker_pair(schema_template):
+    """
+    Class-scoped (site-a, site-b) tracker pair for scenario tests.
+
+    Reusing one pair amortizes database setup across a class; tests
+    must call reset() between cases (see the autouse fixture in
+    TestSyncScenarios).
+    """
+    seeds = []
+    trackers = []
+    for site_id in ("site-a", "site-b"):
+        uri = memory_db_uri(site_id.replace("-", "_"))
+        seed = sqlite3.connect(uri, uri=True)
+        schema_template.backup(seed)
+        seeds.append(seed)
+        trackers.append(ChangeTracker(uri, site_id, _skip_ddl=True))
+
+    yield tuple(trackers)
+
+    for tracker in trackers:
+        tracker.close()
+    for seed in seeds:
+        seed.close()
@@ -2,10 +2,11 @@
 Tests for change tracking functionality.
 """
 
+import json
 import pytest
-import tempfile
-import os
-from datetime import datetime
+import sqlite3
+from dataclasses import replace
+from datetime import datetime, timezone
 from pathlib import Path
 
 from chora_sync.changes import ChangeTracker, Change, ChangeType
@@ -13,20 +14,15 @@ from chora_sync.clock import VectorClock
 
 
 @pytest.fixture
-def temp_db():
-    """Create a temporary database file."""
-    fd, path = tempfile.mkstemp(suffix=".db")
-    os.close(fd)
-    yield path
-    # Cleanup
-    if os.path.exists(path):
-        os.remove(path)
+def temp_db_disk(tmp_path):
+    """Path for an on-disk database file, for tests that need one."""
+    return str(tmp_path / "test.db")
 
 
 @pytest.fixture
-def tracker(temp_db):
+def tracker(temp_db, make_tracker):
     """Create a ChangeTracker with temporary database."""
-    return ChangeTracker(temp_db, "test-site")
+    return make_tracker("test-site", db_uri=temp_db)
 
 
 class TestChangeDataclass:
@@ -69,7 +65,24 @@ class TestChangeDataclass:
         assert d["column_name"] == "name"
         assert d["value"] == '"new-name"'
         assert d["clock"] == {"site-a": 2}
-        assert d["timestamp"] == now.isoformat()
+        # Timestamps serialize as integer microseconds since the epoch
+        assert d["timestamp"] == int(now.replace(tzinfo=timezone.utc).timestamp() * 1_000_000)
+
+    def test_to_dict_is_json_serializable(self):
+        """to_dict output feeds straight into a JSON encoder."""
+        change = Change(
+            entity_id="entity-1",
+            change_type=ChangeType.INSERT,
+            table_name="entities",
+            column_name=None,
+            value=None,
+            site_id="site-a",
+            db_version=1,
+            clock=VectorClock(counters={"site-a": 1}),
+            timestamp=datetime(2024, 1, 15, tzinfo=timezone.utc),
+        )
+        restored = Change.from_dict(json.loads(json.dumps(change.to_dict())))
+        assert restored == change
 
     def test_change_from_dict(self):
         """Create Change from dictionary."""
@@ -101,7 +114,7 @@ class TestChangeDataclass:
             site_id="site-a",
             db_version=1,
             clock=VectorClock(counters={"site-a": 1, "site-b": 2}),
-            timestamp=datetime(2024, 1, 15, 10, 30, 0),
+            timestamp=datetime(2024, 1, 15, 10, 30, 0, tzinfo=timezone.utc),
         )
         restored = Change.from_dict(original.to_dict())
         assert restored.entity_id == original.entity_id
@@ -131,18 +144,12 @@ class TestChangeTrackerInit:
 
     def test_init_creates_tables(self, tracker):
         """Initialization creates required tables."""
-        import sqlite3
-        conn = sqlite3.connect(tracker.db_path)
-        cursor = conn.cursor()
-
-        # Check tables exist
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
+        cursor = tracker._get_connection().execute(
+            "SELECT name FROM sqlite_master WHERE type='table'"
+        )
         tables = {row[0] for row in cursor.fetchall()}
 
-        assert "sync_changes" in tables
-        assert "sync_sites" in tables
-        assert "sync_clock" in tables
-        conn.close()
+        assert tracker.table_names() <= tables
 
     def test_init_starts_with_empty_clock(self, tracker):
         """New tracker starts with empty vector clock."""
@@ -204,20 +211,48 @@ class TestChangeTrackerRecordChange:
         assert tracker.get_current_version() == 0
 
         tracker.record_change("entity-1", ChangeType.INSERT)
-        assert tracker.get_current_version() == 1
-
         tracker.record_change("entity-2", ChangeType.INSERT)
         assert tracker.get_current_version() == 2
 
     def test_multiple_records(self, tracker):
-        """Record multiple changes."""
-        for i in range(5):
-            tracker.record_change(f"entity-{i}", ChangeType.INSERT)
+        """Record multiple changes in one batch."""
+        changes = tracker.record_changes(
+            [(f"entity-{i}", ChangeType.INSERT, None, None) for i in range(5)]
+        )
 
+        assert len(changes) == 5
+        assert [c.db_version for c in changes] == [1, 2, 3, 4, 5]
         assert tracker.get_current_version() == 5
         assert tracker.get_current_clock().get("test-site") == 5
 
 
+class TestChangeTrackerBatch:
+    """Tests for grouping writes with batch()."""
+
+    def test_nested_batch_joins_outer(self, tracker):
+        """Nested batch() blocks share the outermost transaction."""
+        with tracker.batch():
+            tracker.record_change("entity-1", ChangeType.INSERT)
+            with tracker.batch():
+                tracker.record_change("entity-2", ChangeType.INSERT)
+            tracker.record_change("entity-3", ChangeType.INSERT)
+
+        assert tracker.get_current_version() == 3
+        assert len(tracker.get_changes_since(0)) == 3
+
+    def test_batch_rolls_back_on_error(self, tracker):
+        """A raising batch discards its writes and in-memory state."""
+        tracker.record_change("entity-1", ChangeType.INSERT)
+
+        with pytest.raises(RuntimeError):
+            with tracker.batch():
+                tracker.record_change("entity-2", ChangeType.INSERT)
+                raise RuntimeError("boom")
+
+        assert tracker.get_current_version() == 1
+        assert len(tracker.get_changes_since(0)) == 1
+
+
 class TestChangeTrackerGetChanges:
     """Tests for retrieving changes."""
 
@@ -248,6 +283,19 @@ class TestChangeTrackerGetChanges:
         assert len(changes) == 1
         assert changes[0].entity_id == "entity-3"
 
+    def test_get_change_headers(self, tracker):
+        """Header query returns bare (entity_id, site_id, db_version) tuples."""
+        tracker.record_change("entity-1", ChangeType.INSERT)
+        tracker.record_change("entity-2", ChangeType.INSERT)
+
+        assert tracker.get_change_headers_since(0) == [
+            ("entity-1", "test-site", 1),
+            ("entity-2", "test-site", 2),
+        ]
+        assert tracker.get_change_headers_since(1) == [
+            ("entity-2", "test-site", 2),
+        ]
+
     def test_get_changes_preserves_clock(self, tracker):
         """Retrieved changes have correct vector clocks."""
         tracker.record_change("entity-1", ChangeType.INSERT)
@@ -258,24 +306,27 @@ class TestChangeTrackerGetChanges:
         assert changes[1].clock.get("test-site") == 2
 
 
+# Shared prototype for remote-change tests; Change is frozen, so tests
+# derive per-case variants with dataclasses.replace().
+_REMOTE_CHANGE = Change(
+    entity_id="entity-1",
+    change_type=ChangeType.INSERT,
+    table_name="entities",
+    column_name=None,
+    value='{"name": "remote"}',
+    site_id="remote-site",
+    db_version=1,
+    clock=VectorClock(counters={"remote-site": 1}),
+    timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
+)
+
+
 class TestChangeTrackerApplyRemote:
     """Tests for applying remote changes."""
 
     def test_apply_remote_change(self, tracker):
         """Apply a change from another site."""
-        remote_change = Change(
-            entity_id="entity-1",
-            change_type=ChangeType.INSERT,
-            table_name="entities",
-            column_name=None,
-            value='{"name": "remote"}',
-            site_id="remote-site",
-            db_version=1,
-            clock=VectorClock(counters={"remote-site": 1}),
-            timestamp=datetime.utcnow(),
-        )
-
-        result = tracker.apply_remote_change(remote_change)
+        result = tracker.apply_remote_change(_REMOTE_CHANGE)
         assert result is True
 
         # Clock should be merged
@@ -284,21 +335,9 @@ class TestChangeTrackerApplyRemote:
 
     def test_apply_duplicate_change(self, tracker):
         """Applying duplicate change returns False."""
-        remote_change = Change(
-            entity_id="entity-1",
-            change_type=ChangeType.INSERT,
-            table_name="entities",
-            column_name=None,
-            value='{"name": "remote"}',
-            site_id="remote-site",
-            db_version=1,
-            clock=VectorClock(counters={"remote-site": 1}),
-            timestamp=datetime.utcnow(),
-        )
-
         # Apply twice
-        result1 = tracker.apply_remote_change(remote_change)
-        result2 = tracker.apply_remote_change(remote_change)
+        result1 = tracker.apply_remote_change(_REMOTE_CHANGE)
+        result2 = tracker.apply_remote_change(_REMOTE_CHANGE)
 
         assert result1 is True
         assert result2 is False
@@ -309,16 +348,12 @@ class TestChangeTrackerApplyRemote:
         tracker.record_change("local-entity", ChangeType.INSERT)
 
         # Apply remote change
-        remote_change = Change(
+        remote_change = replace(
+            _REMOTE_CHANGE,
             entity_id="remote-entity",
-            change_type=ChangeType.INSERT,
-            table_name="entities",
-            column_name=None,
             value=None,
-            site_id="remote-site",
             db_version=5,
             clock=VectorClock(counters={"remote-site": 5}),
-            timestamp=datetime.utcnow(),
         )
         tracker.apply_remote_change(remote_change)
 
@@ -327,6 +362,14 @@ class TestChangeTrackerApplyRemote:
         assert clock.get("test-site") == 1
         assert clock.get("remote-site") == 5
 
+    def test_bulk_apply_skips_in_batch_duplicates(self, tracker):
+        """Bulk apply drops repeats the seen-set can't catch."""
+        applied = tracker.apply_remote_changes_bulk(
+            [_REMOTE_CHANGE, replace(_REMOTE_CHANGE)]
+        )
+        assert applied == 1
+        assert len(tracker.get_changes_since(0)) == 1
+
 
 class TestChangeTrackerSiteTracking:
     """Tests for site version tracking."""
@@ -360,38 +403,116 @@ class TestChangeTrackerSiteTracking:
         assert tracker.get_site_version("site-c") == 15
 
 
+# Keep the disk-backed persistence tests on one xdist worker
+# (run with: pytest -n auto --dist=loadgroup)
+@pytest.mark.xdist_group("disk_persistence")
 class TestChangeTrackerPersistence:
     """Tests for persistence across tracker instances."""
 
-    def test_clock_persists(self, temp_db):
+    def test_clock_persists(self, temp_db_disk):
         """Clock state persists across tracker instances."""
         # First tracker
-        tracker1 = ChangeTracker(temp_db, "test-site")
+        tracker1 = ChangeTracker(temp_db_disk, "test-site")
         tracker1.record_change("entity-1", ChangeType.INSERT)
         tracker1.record_change("entity-2", ChangeType.INSERT)
 
         # New tracker on same database
-        tracker2 = ChangeTracker(temp_db, "test-site")
+        tracker2 = ChangeTracker(temp_db_disk, "test-site")
         clock = tracker2.get_current_clock()
         assert clock.get("test-site") == 2
 
-    def test_changes_persist(self, temp_db):
+    def test_changes_persist(self, temp_db_disk):
         """Changes persist across tracker instances."""
         # First tracker
-        tracker1 = ChangeTracker(temp_db, "test-site")
+        tracker1 = ChangeTracker(temp_db_disk, "test-site")
         tracker1.record_change("entity-1", ChangeType.INSERT)
 
         # New tracker
-        tracker2 = ChangeTracker(temp_db, "test-site")
+        tracker2 = ChangeTracker(temp_db_disk, "test-site")
         changes = tracker2.get_changes_since(0)
         assert len(changes) == 1
         assert changes[0].entity_id == "entity-1"
 
-    def test_version_persists(self, temp_db):
+    def test_version_persists(self, temp_db_disk):
         """Version persists across tracker instances."""
-        tracker1 = ChangeTracker(temp_db, "test-site")
+        tracker1 = ChangeTracker(temp_db_disk, "test-site")
         tracker1.record_change("entity-1", ChangeType.INSERT)
         tracker1.record_change("entity-2", ChangeType.INSERT)
 
-        tracker2 = ChangeTracker(temp_db, "test-site")
+        tracker2 = ChangeTracker(temp_db_disk, "test-site")
         assert tracker2.get_current_version() == 2
+
+    def test_bulk_apply_with_stale_tracker(self, temp_db_disk):
+        """A stale tracker skips rows another instance already wrote."""
+        tracker1 = ChangeTracker(temp_db_disk, "site-1")
+        tracker2 = ChangeTracker(temp_db_disk, "site-2")
+
+        # tracker2's seen-set predates this write
+        tracker1.apply_remote_change(_REMOTE_CHANGE)
+
+        fresh = replace(_REMOTE_CHANGE, entity_id="entity-2", db_version=2)
+        applied = tracker2.apply_remote_changes_bulk([_REMOTE_CHANGE, fresh])
+        assert applied == 1
+
+
+class TestLegacySchemaMigration:
+    """Tests for upgrading databases created before the binary formats."""
+
+    # sync_changes layout as created by early releases: JSON-text clocks,
+    # ISO-8601 text timestamps, no dedup constraint
+    _LEGACY_DDL = """
+        CREATE TABLE sync_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_id TEXT NOT NULL,
+            change_type TEXT NOT NULL CHECK (change_type IN ('insert', 'update', 'delete')),
+            table_name TEXT NOT NULL,
+            column_name TEXT,
+            value TEXT,
+            site_id TEXT NOT NULL,
+            db_version INTEGER NOT NULL,
+            clock_json TEXT NOT NULL,
+            timestamp TEXT NOT NULL
+        );
+        CREATE INDEX idx_sync_changes_version ON sync_changes(db_version);
+        CREATE INDEX idx_sync_changes_entity ON sync_changes(entity_id);
+        CREATE TABLE sync_clock (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            clock_json TEXT NOT NULL
+        );
+        INSERT INTO sync_changes
+            (entity_id, change_type, table_name, column_name, value, site_id, db_version, clock_json, timestamp)
+        VALUES
+            ('entity-1', 'insert', 'entities', NULL, NULL, 'old-site', 1,
+             '{"old-site": 1}', '2024-01-01T00:00:00+00:00');
+        INSERT INTO sync_clock (id, clock_json) VALUES (1, '{"old-site": 1}');
+    """
+
+    @pytest.fixture
+    def legacy_db(self, temp_db):
+        """Database seeded with the pre-series schema and one old change."""
+        seed = sqlite3.connect(temp_db, uri=True)
+        seed.executescript(self._LEGACY_DDL)
+        yield temp_db
+        seed.close()
+
+    def test_migrates_legacy_rows(self, legacy_db):
+        """Old JSON clocks and ISO timestamps are readable after upgrade."""
+        with ChangeTracker(legacy_db, "test-site") as tracker:
+            changes = tracker.get_changes_since(0)
+            assert len(changes) == 1
+            assert changes[0].entity_id == "entity-1"
+            assert changes[0].clock == VectorClock(counters={"old-site": 1})
+            assert changes[0].timestamp == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def test_recording_after_migration(self, legacy_db):
+        """A migrated database accepts new changes normally."""
+        with ChangeTracker(legacy_db, "test-site") as tracker:
+            change = tracker.record_change("entity-2", ChangeType.INSERT)
+            assert change.db_version == 2
+            assert len(tracker.get_changes_since(0)) == 2
+
+    def test_migrated_table_deduplicates(self, legacy_db):
+        """The upgrade adds the UNIQUE constraint used for dedup."""
+        with ChangeTracker(legacy_db, "test-site") as tracker:
+            duplicate = tracker.get_changes_since(0)[0]
+            assert tracker.apply_remote_change(duplicate) is False
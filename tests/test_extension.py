@@ -7,16 +7,43 @@ Note: Most tests use mocks since CR-SQLite may not be installed.
 import pytest
 import platform
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
+
+
+class _FakeConn:
+    """Minimal stand-in for sqlite3.Connection in loader tests."""
+
+    __slots__ = ("_calls", "_load_side_effect")
+
+    def __init__(self, load_side_effect=None):
+        self._calls = []
+        self._load_side_effect = load_side_effect
+
+    def enable_load_extension(self, enabled):
+        self._calls.append(("enable_load_extension", enabled))
+
+    def load_extension(self, path):
+        self._calls.append(("load_extension", path))
+        if self._load_side_effect is not None:
+            raise self._load_side_effect
 
 from chora_sync.extension import (
     CRSQLiteNotAvailable,
+    _resolve_env_path,
     get_extension_path,
     is_crsqlite_available,
     load_crsqlite,
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_extension_path_cache():
+    """Reset the cached extension path so patched lookups take effect."""
+    get_extension_path.cache_clear()
+    yield
+    get_extension_path.cache_clear()
+
+
 class TestGetExtensionPath:
     """Tests for get_extension_path."""
 
@@ -25,41 +52,31 @@ class TestGetExtensionPath:
         result = get_extension_path()
         assert result is None or isinstance(result, Path)
 
-    @patch("chora_sync.extension.platform.system")
-    def test_darwin_extension_name(self, mock_system):
-        """Uses .dylib on macOS."""
-        mock_system.return_value = "Darwin"
-        # Just check it doesn't crash
-        get_extension_path()
-
-    @patch("chora_sync.extension.platform.system")
-    def test_linux_extension_name(self, mock_system):
-        """Uses .so on Linux."""
-        mock_system.return_value = "Linux"
-        get_extension_path()
-
-    @patch("chora_sync.extension.platform.system")
-    def test_windows_extension_name(self, mock_system):
-        """Uses .dll on Windows."""
-        mock_system.return_value = "Windows"
-        get_extension_path()
-
-    @patch("chora_sync.extension.platform.system")
-    def test_unknown_system_returns_none(self, mock_system):
-        """Returns None for unknown systems."""
-        mock_system.return_value = "UnknownOS"
+    @pytest.mark.parametrize("system,expected_suffix", [
+        ("Darwin", ".dylib"),
+        ("Linux", ".so"),
+        ("Windows", ".dll"),
+        ("UnknownOS", None),
+    ])
+    def test_extension_name_per_platform(self, monkeypatch, system, expected_suffix):
+        """Uses the platform-specific extension name (None when unsupported)."""
+        monkeypatch.setattr("chora_sync.extension.platform.system", lambda: system)
         result = get_extension_path()
-        assert result is None
+        if expected_suffix is None:
+            assert result is None
+        else:
+            assert result is None or result.suffix == expected_suffix
 
-    @patch.dict("os.environ", {"CRSQLITE_PATH": "/custom/path/crsqlite.dylib"})
-    @patch("pathlib.Path.exists")
-    def test_uses_env_var(self, mock_exists):
+    def test_uses_env_var(self, monkeypatch):
         """Checks CRSQLITE_PATH environment variable."""
-        mock_exists.return_value = True
-        # The function should check this path
-        result = get_extension_path()
-        # If env path exists, it should be found
-        assert result is not None
+        monkeypatch.setenv("CRSQLITE_PATH", "/custom/path/crsqlite.dylib")
+        result = _resolve_env_path(exists_fn=lambda _: True)
+        assert result == Path("/custom/path/crsqlite.dylib")
+
+    def test_env_var_missing_file(self, monkeypatch):
+        """CRSQLITE_PATH pointing at a missing file resolves to None."""
+        monkeypatch.setenv("CRSQLITE_PATH", "/custom/path/crsqlite.dylib")
+        assert _resolve_env_path(exists_fn=lambda _: False) is None
 
 
 class TestIsCrsqliteAvailable:
@@ -85,39 +102,34 @@ class TestLoadCrsqlite:
     def test_raises_when_not_available(self, mock_get_path):
         """Raises CRSQLiteNotAvailable when extension not found."""
         mock_get_path.return_value = None
-        conn = MagicMock()
+        conn = _FakeConn()
 
         with pytest.raises(CRSQLiteNotAvailable) as exc_info:
             load_crsqlite(conn)
 
         assert "not found" in str(exc_info.value)
+        assert conn._calls == []
 
     @patch("chora_sync.extension.get_extension_path")
     def test_enables_extension_loading(self, mock_get_path):
         """Enables extension loading on connection."""
         mock_get_path.return_value = Path("/some/path/crsqlite.dylib")
-        conn = MagicMock()
+        conn = _FakeConn()
 
-        try:
-            load_crsqlite(conn)
-        except:
-            pass  # May fail loading, but should enable first
+        load_crsqlite(conn)
 
-        conn.enable_load_extension.assert_called_with(True)
+        assert conn._calls[0] == ("enable_load_extension", True)
 
     @patch("chora_sync.extension.get_extension_path")
     def test_uses_explicit_path(self, mock_get_path):
         """Uses explicit path when provided."""
         explicit_path = Path("/explicit/path/crsqlite.dylib")
-        conn = MagicMock()
+        conn = _FakeConn()
 
-        try:
-            load_crsqlite(conn, extension_path=explicit_path)
-        except:
-            pass
+        load_crsqlite(conn, extension_path=explicit_path)
 
         # Should call load_extension with path without extension
-        conn.load_extension.assert_called()
+        assert ("load_extension", "/explicit/path/crsqlite") in conn._calls
 
     @patch("chora_sync.extension.get_extension_path")
     def test_wraps_load_error(self, mock_get_path):
@@ -125,8 +137,7 @@ class TestLoadCrsqlite:
         import sqlite3
 
         mock_get_path.return_value = Path("/some/path/crsqlite.dylib")
-        conn = MagicMock()
-        conn.load_extension.side_effect = sqlite3.OperationalError("load failed")
+        conn = _FakeConn(load_side_effect=sqlite3.OperationalError("load failed"))
 
         with pytest.raises(CRSQLiteNotAvailable) as exc_info:
             load_crsqlite(conn)